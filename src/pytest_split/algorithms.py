@@ -1,7 +1,6 @@
 import enum
 import functools
 import heapq
-from operator import itemgetter
 from typing import TYPE_CHECKING, NamedTuple
 
 if TYPE_CHECKING:
@@ -23,6 +22,7 @@ def least_duration(
     Split tests into groups by runtime.
     It walks the test items, starting with the test with largest duration.
     It assigns the test with the largest runtime to the group with the smallest duration sum.
+    This is the "longest processing time first" (LPT) scheduling heuristic.
 
     The algorithm sorts the items by their duration. Since the sorting algorithm is stable, ties will be broken by
     maintaining the original order of items. It is therefore important that the order of items be identical on all nodes
@@ -34,55 +34,85 @@ def least_duration(
     :return:
         List of groups
     """
-    items_with_durations = _get_items_with_durations(items, durations)
+    if durations:
+        assignment, duration = _assign_least_duration(splits, items, durations)
+    else:
+        assignment, duration = _assign_round_robin(splits, items)
 
-    # add index of item in list
-    items_with_durations_indexed = [
-        (*tup, i) for i, tup in enumerate(items_with_durations)
-    ]
+    # walking the items in their original order maintains relative ordering,
+    # which lets pytest reuse fixtures between consecutive tests
+    selected: "List[List[nodes.Item]]" = [[] for _ in range(splits)]
+    for item, assigned in zip(items, assignment):
+        selected[assigned].append(item)
 
-    # Sort by name to ensure it's always the same order
-    items_with_durations_indexed = sorted(
-        items_with_durations_indexed, key=lambda tup: str(tup[0])
-    )
+    groups = []
+    for i in range(splits):
+        d = [item for item, assigned in zip(items, assignment) if assigned != i]
+        group = TestGroup(selected=selected[i], deselected=d, duration=duration[i])
+        groups.append(group)
+    return groups
 
-    # sort in ascending order
-    sorted_items_with_durations = sorted(
-        items_with_durations_indexed, key=lambda tup: tup[1], reverse=True
+
+def _assign_least_duration(
+    splits: int, items: "List[nodes.Item]", durations: "Dict[str, float]"
+) -> "Tuple[List[int], List[float]]":
+    """
+    Returns the group index of each item and the summed duration of each group.
+    """
+    item_durations = _get_item_durations(items, durations)
+
+    # Sort the indices of the items in descending order of duration, breaking ties
+    # by name to ensure it's always the same order. A single sort on the combined
+    # key is equivalent to sorting by name and then (stably) by duration.
+    sorted_indices = sorted(
+        range(len(items)), key=lambda i: (-item_durations[i], str(items[i]))
     )
 
-    selected: "List[List[Tuple[nodes.Item, int]]]" = [[] for _ in range(splits)]
-    deselected: "List[List[nodes.Item]]" = [[] for _ in range(splits)]
-    duration: "List[float]" = [0 for _ in range(splits)]
+    # group index of each item, by original index
+    assignment: "List[int]" = [0 for _ in range(len(items))]
 
     # create a heap of the form (summed_durations, group_index)
     heap: "List[Tuple[float, int]]" = [(0, i) for i in range(splits)]
     heapq.heapify(heap)
-    for item, item_duration, original_index in sorted_items_with_durations:
+    # local name for the loop below, which runs once per test item
+    heapreplace = heapq.heapreplace
+    for original_index in sorted_indices:
         # get group with smallest sum
-        summed_durations, group_idx = heapq.heappop(heap)
-        new_group_durations = summed_durations + item_duration
+        summed_durations, group_idx = heap[0]
 
         # store assignment
-        selected[group_idx].append((item, original_index))
-        duration[group_idx] = new_group_durations
-        for i in range(splits):
-            if i != group_idx:
-                deselected[i].append(item)
+        assignment[original_index] = group_idx
 
         # store new duration - in case of ties it sorts by the group_idx
-        heapq.heappush(heap, (new_group_durations, group_idx))
+        # replacing the smallest entry sifts the heap once instead of pop + push
+        heapreplace(
+            heap, (summed_durations + item_durations[original_index], group_idx)
+        )
+
+    # the heap holds the final summed duration of every group
+    duration: "List[float]" = [0 for _ in range(splits)]
+    for summed_durations, group_idx in heap:
+        duration[group_idx] = summed_durations
+    return assignment, duration
 
-    groups = []
-    for i in range(splits):
-        # sort the items by their original index to maintain relative ordering
-        # we don't care about the order of deselected items
-        s = [
-            item for item, original_index in sorted(selected[i], key=lambda tup: tup[1])
-        ]
-        group = TestGroup(selected=s, deselected=deselected[i], duration=duration[i])
-        groups.append(group)
-    return groups
+
+def _assign_round_robin(
+    splits: int, items: "List[nodes.Item]"
+) -> "Tuple[List[int], List[float]]":
+    """
+    Equivalent of _assign_least_duration when there are no durations.
+
+    Every test then gets the same duration, so the items are sorted by name only
+    and the heap just cycles through the groups. This skips the heap altogether.
+    """
+    sorted_indices = sorted(range(len(items)), key=lambda i: str(items[i]))
+    assignment: "List[int]" = [0 for _ in range(len(items))]
+    for position, original_index in enumerate(sorted_indices):
+        assignment[original_index] = position % splits
+    duration: "List[float]" = [
+        len(range(group_idx, len(items), splits)) for group_idx in range(splits)
+    ]
+    return assignment, duration
 
 
 def duration_based_chunks(
@@ -99,39 +129,52 @@ def duration_based_chunks(
     :param durations: Our cached test runtimes. Assumes contains timings only of relevant tests
     :return: List of TestGroup
     """
-    items_with_durations = _get_items_with_durations(items, durations)
-    time_per_group = sum(map(itemgetter(1), items_with_durations)) / splits
-
     selected: "List[List[nodes.Item]]" = [[] for i in range(splits)]
-    deselected: "List[List[nodes.Item]]" = [[] for i in range(splits)]
     duration: "List[float]" = [0 for i in range(splits)]
 
-    group_idx = 0
-    for item, item_duration in items_with_durations:
-        if duration[group_idx] >= time_per_group:
-            group_idx += 1
-
-        selected[group_idx].append(item)
+    if not durations:
+        # Every test gets the same duration, so each group (but the last) gets the
+        # same number of tests: the smallest number reaching the time per group
+        chunk_size = -(-len(items) // splits)
         for i in range(splits):
-            if i != group_idx:
-                deselected[i].append(item)
-        duration[group_idx] += item_duration
+            start, end = i * chunk_size, (i + 1) * chunk_size
+            selected[i] = list(items[start:end])
+            duration[i] = len(selected[i])
+    else:
+        item_durations = _get_item_durations(items, durations)
+        time_per_group = sum(item_durations) / splits
 
-    return [
-        TestGroup(selected=selected[i], deselected=deselected[i], duration=duration[i])
-        for i in range(splits)
-    ]
+        group_idx = 0
+        for item, item_duration in zip(items, item_durations):
+            if duration[group_idx] >= time_per_group:
+                group_idx += 1
 
+            selected[group_idx].append(item)
+            duration[group_idx] += item_duration
 
-def _get_items_with_durations(
+    # groups are consecutive chunks, so each group's deselected items are the
+    # items before and after its chunk
+    groups = []
+    start = 0
+    for i in range(splits):
+        end = start + len(selected[i])
+        deselected = [*items[:start], *items[end:]]
+        groups.append(
+            TestGroup(selected=selected[i], deselected=deselected, duration=duration[i])
+        )
+        start = end
+    return groups
+
+
+def _get_item_durations(
     items: "List[nodes.Item]", durations: "Dict[str, float]"
-) -> "List[Tuple[nodes.Item, float]]":
-    durations = _remove_irrelevant_durations(items, durations)
+) -> "List[float]":
+    # Item.nodeid is resolved only once per item
+    nodeids = [item.nodeid for item in items]
+    durations = _remove_irrelevant_durations(nodeids, durations)
     avg_duration_per_test = _get_avg_duration_per_test(durations)
-    items_with_durations = [
-        (item, durations.get(item.nodeid, avg_duration_per_test)) for item in items
-    ]
-    return items_with_durations
+    get_duration = durations.get
+    return [get_duration(nodeid, avg_duration_per_test) for nodeid in nodeids]
 
 
 def _get_avg_duration_per_test(durations: "Dict[str, float]") -> float:
@@ -144,10 +187,11 @@ def _get_avg_duration_per_test(durations: "Dict[str, float]") -> float:
 
 
 def _remove_irrelevant_durations(
-    items: "List[nodes.Item]", durations: "Dict[str, float]"
+    test_ids: "List[str]", durations: "Dict[str, float]"
 ) -> "Dict[str, float]":
     # Filtering down durations to relevant ones ensures the avg isn't skewed by irrelevant data
-    test_ids = [item.nodeid for item in items]
+    if not durations:
+        return {}
     durations = {name: durations[name] for name in test_ids if name in durations}
     return durations
 
@@ -1,7 +1,8 @@
 import argparse
-import json
 from typing import TYPE_CHECKING
 
+from pytest_split.durations import load_durations, load_durations_log
+
 if TYPE_CHECKING:
     from typing import Dict
 
@@ -15,7 +16,7 @@ def list_slowest_tests() -> None:
             "default is .test_durations in the current working directory"
         ),
         default=".test_durations",
-        type=argparse.FileType(),
+        type=argparse.FileType(encoding="utf-8"),
     )
     parser.add_argument(
         "-c",
@@ -25,7 +26,9 @@ def list_slowest_tests() -> None:
         type=int,
     )
     args = parser.parse_args()
-    return _list_slowest_tests(json.load(args.durations_path), args.count)
+    durations = load_durations(args.durations_path)
+    durations.update(load_durations_log(args.durations_path.name))
+    return _list_slowest_tests(durations, args.count)
 
 
 def _list_slowest_tests(durations: "Dict[str, float]", count: int) -> None:
@@ -0,0 +1,156 @@
+import enum
+import importlib
+import json
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import ModuleType
+    from typing import IO, Dict, List, Optional, Tuple, Union
+
+try:
+    # Optional, considerably faster parsing of large durations files. Imported by
+    # name so that type checking doesn't depend on whether it's installed.
+    orjson: "Optional[ModuleType]" = importlib.import_module("orjson")
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class DurationsFormat(enum.Enum):
+    # JSON object mapping test ids to durations
+    json = "json"
+    # One "<test id>\t<duration>" line per test, smaller and faster to parse
+    tsv = "tsv"
+
+    @staticmethod
+    def names() -> "List[str]":
+        return [x.name for x in DurationsFormat]
+
+
+def load_durations(f: "IO[str]") -> "Dict[str, float]":
+    """
+    Load durations from a durations file in any of the supported formats.
+    """
+    content = f.read()
+    return parse_durations(content, detect_format(content))
+
+
+def read_durations(durations_path: str) -> "Tuple[Dict[str, float], DurationsFormat]":
+    """
+    Read the durations and the format of a durations file.
+
+    Raises FileNotFoundError if there is no durations file.
+    """
+    # Avoid holding both the raw bytes and a decoded copy of a large file:
+    # orjson parses the bytes directly, json parses the decoded text
+    content: "Union[str, bytes]"
+    if orjson is not None:
+        with open(durations_path, "rb") as f:
+            content = f.read()
+    else:
+        with open(durations_path, encoding="utf-8", newline="") as f:
+            content = f.read()
+
+    durations_format = detect_format(content)
+    return parse_durations(content, durations_format), durations_format
+
+
+def detect_format(content: "Union[str, bytes]") -> DurationsFormat:
+    """
+    Returns the format of the durations file content.
+    """
+    # Comparing bytes with str would warn under 'python -b'
+    json_starts = (b"{", b"[") if isinstance(content, bytes) else ("{", "[")
+    if content.lstrip()[:1] in json_starts:
+        return DurationsFormat.json
+    return DurationsFormat.tsv
+
+
+def parse_durations(
+    content: "Union[str, bytes]", durations_format: DurationsFormat
+) -> "Dict[str, float]":
+    """
+    Parses the content of a durations file in the given format.
+    """
+    if durations_format is DurationsFormat.tsv:
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        return _parse_tsv(content)
+
+    parsed: "Union[Dict[str, float], List[Tuple[str, float]]]" = (
+        orjson.loads(content) if orjson is not None else json.loads(content)
+    )
+
+    # This code provides backwards compatibility after we switched
+    # from saving durations in a list-of-lists to a dict format
+    # Remove this when bumping to v1
+    if isinstance(parsed, list):
+        parsed = {test_name: duration for test_name, duration in parsed}
+
+    return parsed
+
+
+def durations_log_path(durations_path: str) -> str:
+    """
+    Returns the path of the append-only log next to a durations file.
+    """
+    return f"{durations_path}.log"
+
+
+def load_durations_log(durations_path: str) -> "Dict[str, float]":
+    """
+    Load the durations appended to the log of a durations file, the last one wins.
+    """
+    try:
+        with open(
+            durations_log_path(durations_path), encoding="utf-8", newline=""
+        ) as f:
+            content = f.read()
+    except FileNotFoundError:
+        return {}
+    # Ignore a line that an interrupted append left without its line break
+    return _parse_tsv(content[: content.rfind("\n") + 1])
+
+
+def append_durations_log(durations: "Dict[str, float]", durations_path: str) -> None:
+    """
+    Append durations to the log of a durations file.
+    """
+    content = format_durations(durations, DurationsFormat.tsv)
+    with open(durations_log_path(durations_path), "ab+") as f:
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                # Drop a line that an interrupted append left without its line
+                # break, rather than appending to it
+                f.seek(0)
+                f.truncate(f.read().rfind(b"\n") + 1)
+        f.write(content.encode("utf-8"))
+
+
+def format_durations(
+    durations: "Dict[str, float]", durations_format: DurationsFormat
+) -> str:
+    """
+    Serializes durations into the content of a durations file.
+    """
+    if durations_format is DurationsFormat.tsv:
+        return "".join(
+            f"{test_name}\t{duration:.6g}\n"
+            for test_name, duration in sorted(durations.items())
+        )
+
+    # json.dumps does a single join of everything produced by the (pure Python)
+    # indenting encoder, which is a lot faster than json.dump writing every chunk
+    return json.dumps(durations, sort_keys=True, indent=4)
+
+
+def _parse_tsv(content: str) -> "Dict[str, float]":
+    durations = {}
+    # Not splitlines(), which also splits on characters test ids may contain
+    for line in content.split("\n"):
+        if line:
+            # Test ids can't contain tabs, pytest escapes them
+            test_name, duration = line.rsplit("\t", 1)
+            durations[test_name] = float(duration)
+    return durations
@@ -1,4 +1,5 @@
-import json
+import contextlib
+import itertools
 import os
 from typing import TYPE_CHECKING
 
@@ -7,10 +8,18 @@ from _pytest.config import create_terminal_writer, hookimpl
 from _pytest.reports import TestReport
 
 from pytest_split import algorithms
+from pytest_split.durations import (
+    DurationsFormat,
+    append_durations_log,
+    durations_log_path,
+    format_durations,
+    load_durations_log,
+    read_durations,
+)
 from pytest_split.ipynb_compatibility import ensure_ipynb_compatibility
 
 if TYPE_CHECKING:
-    from typing import Dict, List, Optional, Union
+    from typing import Dict, List, Optional, Set, Tuple, Union
 
     from _pytest import nodes
     from _pytest.config import Config
@@ -21,6 +30,18 @@ if TYPE_CHECKING:
 # Ugly hack for freezegun compatibility: https://github.com/spulec/freezegun/issues/286
 STORE_DURATIONS_SETUP_AND_TEARDOWN_THRESHOLD = 60 * 10  # seconds
 
+# With --durations-append, the log is merged into the durations file once it
+# grows larger than this fraction of the durations file
+DURATIONS_LOG_COMPACTION_RATIO = 0.25
+
+
+def _nodeid_file(nodeid: str) -> str:
+    return nodeid.split("::", 1)[0]
+
+
+def _is_under(path: str, roots: "List[str]") -> bool:
+    return any(path == root or path.startswith(root + os.sep) for root in roots)
+
 
 def pytest_addoption(parser: "Parser") -> None:
     """
@@ -45,6 +66,27 @@ def pytest_addoption(parser: "Parser") -> None:
         ),
         default=os.path.join(os.getcwd(), ".test_durations"),
     )
+    group.addoption(
+        "--durations-format",
+        dest="durations_format",
+        type=str,
+        help=(
+            "Format in which durations are stored. Stored durations are read "
+            f"in any format. Choices: {DurationsFormat.names()}"
+        ),
+        default="json",
+        choices=DurationsFormat.names(),
+    )
+    group.addoption(
+        "--durations-append",
+        dest="durations_append",
+        action="store_true",
+        help=(
+            "Append changed durations to '--durations-path' + '.log' instead of "
+            "rewriting '--durations-path' on every run with '--store-durations'. "
+            "The log is merged into the durations file once it gets too large."
+        ),
+    )
     group.addoption(
         "--splits",
         dest="splits",
@@ -74,6 +116,17 @@ def pytest_addoption(parser: "Parser") -> None:
             "while running the suite with '--store-durations'."
         ),
     )
+    group.addoption(
+        "--prune-durations",
+        dest="prune_durations",
+        action="store_true",
+        help=(
+            "Removes the test duration info for tests which are not collected "
+            "while running the suite with '--store-durations'. Unlike "
+            "'--clean-durations', durations of deselected tests are kept, and "
+            "so are those of tests outside the given paths whose files exist."
+        ),
+    )
 
 
 @pytest.mark.tryfirst
@@ -118,26 +171,40 @@ def pytest_configure(config: "Config") -> None:
 class Base:
     def __init__(self, config: "Config") -> None:
         """
-        Load durations and set up a terminal writer.
+        Set up a terminal writer, durations are loaded on first access.
 
         This logic is shared for both the split- and cache plugin.
         """
         self.config = config
         self.writer = create_terminal_writer(self.config)
+        self._cached_durations: "Optional[Dict[str, float]]" = None
+        # Format of the durations file, None if there is none
+        self._durations_format: "Optional[DurationsFormat]" = None
+
+    @property
+    def cached_durations(self) -> "Dict[str, float]":
+        """
+        Durations stored in the durations file, loaded lazily as the file may be large.
+        """
+        if self._cached_durations is None:
+            self._cached_durations = self._load_durations()
+        return self._cached_durations
+
+    @cached_durations.setter
+    def cached_durations(self, durations: "Dict[str, float]") -> None:
+        self._cached_durations = durations
 
+    def _load_durations(self) -> "Dict[str, float]":
         try:
-            with open(config.option.durations_path) as f:
-                self.cached_durations = json.loads(f.read())
+            durations, self._durations_format = read_durations(
+                self.config.option.durations_path
+            )
         except FileNotFoundError:
-            self.cached_durations = {}
+            durations = {}
 
-        # This code provides backwards compatibility after we switched
-        # from saving durations in a list-of-lists to a dict format
-        # Remove this when bumping to v1
-        if isinstance(self.cached_durations, list):
-            self.cached_durations = {
-                test_name: duration for test_name, duration in self.cached_durations
-            }
+        # Durations appended with --durations-append take precedence
+        durations.update(load_durations_log(self.config.option.durations_path))
+        return durations
 
 
 class PytestSplitPlugin(Base):
@@ -159,6 +226,9 @@ class PytestSplitPlugin(Base):
     ) -> None:
         """
         Collect and select the tests we want to run, and deselect the rest.
+
+        The selected tests keep the order in which they were collected, so that
+        pytest can reuse fixtures between consecutive tests as it normally would.
         """
         splits: int = config.option.splits
         group_idx: int = config.option.group
@@ -168,9 +238,10 @@ class PytestSplitPlugin(Base):
         group = groups[group_idx - 1]
 
         ensure_ipynb_compatibility(group, items)
+        selected, deselected, duration = group
 
-        items[:] = group.selected
-        config.hook.pytest_deselected(items=group.deselected)
+        items[:] = selected
+        config.hook.pytest_deselected(items=deselected)
 
         self.writer.line(
             self.writer.markup(
@@ -179,7 +250,7 @@ class PytestSplitPlugin(Base):
         )
         self.writer.line(
             self.writer.markup(
-                f"[pytest-split] Running group {group_idx}/{splits} (estimated duration: {group.duration:.2f}s)\n"
+                f"[pytest-split] Running group {group_idx}/{splits} (estimated duration: {duration:.2f}s)\n"
             )
         )
         return None
@@ -190,46 +261,170 @@ class PytestSplitCachePlugin(Base):
     The cache plugin writes durations to our durations file.
     """
 
-    def pytest_sessionfinish(self) -> None:
+    def __init__(self, config: "Config"):
+        super().__init__(config)
+        # Test ids of the durations to remove for '--prune-durations'
+        self._stale_nodeids: "Optional[Set[str]]" = None
+
+    @hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, items: "List[nodes.Item]") -> None:
+        """
+        Find the durations of tests which weren't collected for '--prune-durations'.
+        """
+        # '--lf' only collects the failed tests of the files it doesn't skip
+        if self.config.option.prune_durations and not self.config.getoption(
+            "lf", False
+        ):
+            self._stale_nodeids = self._find_stale_nodeids(
+                {item.nodeid for item in items}
+            )
+
+    def pytest_sessionfinish(self, exitstatus: "Union[int, ExitCode]") -> None:
         """
         Method is called by Pytest after the test-suite has run.
         https://github.com/pytest-dev/pytest/blob/main/src/_pytest/main.py#L308
         """
-        terminal_reporter = self.config.pluginmanager.get_plugin("terminalreporter")
-        test_durations: "Dict[str, float]" = {}
-
-        for test_reports in terminal_reporter.stats.values():
-            for test_report in test_reports:
-                if isinstance(test_report, TestReport):
-
-                    # These ifs be removed after this is solved: # https://github.com/spulec/freezegun/issues/286
-                    if test_report.duration < 0:
-                        continue  # pragma: no cover
-                    if (
-                        test_report.when in ("teardown", "setup")
-                        and test_report.duration
-                        > STORE_DURATIONS_SETUP_AND_TEARDOWN_THRESHOLD
-                    ):
-                        # Ignore not legit teardown durations
-                        continue  # pragma: no cover
-
-                    # Add test durations to map
-                    if test_report.nodeid not in test_durations:
-                        test_durations[test_report.nodeid] = 0
-                    test_durations[test_report.nodeid] += test_report.duration
-
-        if self.config.option.clean_durations:
-            self.cached_durations = dict(test_durations)
-        else:
-            for k, v in test_durations.items():
-                self.cached_durations[k] = v
-
-        with open(self.config.option.durations_path, "w") as f:
-            json.dump(self.cached_durations, f, sort_keys=True, indent=4)
+        changed_durations, removed = self._merge_session_durations()
+        pruned = self._prune_durations(exitstatus)
+        removed = removed or pruned
 
-        message = self.writer.markup(
-            "\n\n[pytest-split] Stored test durations in {}".format(
-                self.config.option.durations_path
+        durations_path = self.config.option.durations_path
+        durations_format = DurationsFormat[self.config.option.durations_format]
+        # Appending and rewriting are only equivalent if the file is in the right format
+        same_format = self._durations_format is durations_format
+
+        # Rewriting an identical file is pure overhead, e.g. when no tests ran
+        if not changed_durations and not removed and same_format:
+            message = self.writer.markup(
+                f"\n\n[pytest-split] Test durations in {durations_path} are up to date"
             )
+            self.writer.line(message)
+            return
+
+        # Removed durations can't be expressed by appending to the log
+        if self.config.option.durations_append and not removed and same_format:
+            append_durations_log(changed_durations, durations_path)
+            log_path = durations_log_path(durations_path)
+            if os.path.getsize(log_path) <= DURATIONS_LOG_COMPACTION_RATIO * (
+                os.path.getsize(durations_path)
+            ):
+                message = self.writer.markup(
+                    f"\n\n[pytest-split] Appended test durations to {log_path}"
+                )
+                self.writer.line(message)
+                return
+
+        self._store_durations(durations_format)
+
+        message = self.writer.markup(
+            f"\n\n[pytest-split] Stored test durations in {durations_path}"
         )
         self.writer.line(message)
+
+    def _merge_session_durations(self) -> "Tuple[Dict[str, float], bool]":
+        """
+        Merges the durations measured in this session into the cached durations.
+
+        Returns the durations which changed, and whether any were removed.
+        """
+        terminal_reporter = self.config.pluginmanager.get_plugin("terminalreporter")
+        clean_durations = self.config.option.clean_durations
+        cached_durations = self.cached_durations
+        # Durations are merged into the cached ones in place, unless only the
+        # durations of this session are to be kept
+        durations: "Dict[str, float]" = {} if clean_durations else cached_durations
+        # Cached durations of the tests which ran (None for new ones), both to
+        # tell what changed and to reset each test's duration on first sight
+        previous_durations: "Dict[str, Optional[float]]" = {}
+
+        threshold = STORE_DURATIONS_SETUP_AND_TEARDOWN_THRESHOLD
+        for test_report in itertools.chain.from_iterable(
+            terminal_reporter.stats.values()
+        ):
+            if not isinstance(test_report, TestReport):
+                continue
+            duration = test_report.duration
+
+            # These ifs be removed after this is solved: # https://github.com/spulec/freezegun/issues/286
+            if duration < 0:
+                continue  # pragma: no cover
+            if duration > threshold and test_report.when in ("teardown", "setup"):
+                # Ignore not legit teardown durations
+                continue  # pragma: no cover
+
+            # Add test durations to map
+            nodeid = test_report.nodeid
+            if nodeid not in previous_durations:
+                previous_durations[nodeid] = cached_durations.get(nodeid)
+                durations[nodeid] = 0
+            durations[nodeid] += duration
+
+        changed_durations = {
+            nodeid: durations[nodeid]
+            for nodeid, previous in previous_durations.items()
+            if durations[nodeid] != previous
+        }
+        removed = clean_durations and not cached_durations.keys() <= durations.keys()
+        self.cached_durations = durations
+        return changed_durations, removed
+
+    def _prune_durations(self, exitstatus: "Union[int, ExitCode]") -> bool:
+        """
+        Removes the durations of tests which weren't collected for '--prune-durations'.
+
+        Returns whether any durations were removed.
+        """
+        # An interrupted session (e.g. by collection errors) may not have
+        # collected every test, so nothing is pruned then
+        if self._stale_nodeids is None or exitstatus == pytest.ExitCode.INTERRUPTED:
+            return False
+
+        for nodeid in self._stale_nodeids:
+            del self.cached_durations[nodeid]
+        return bool(self._stale_nodeids)
+
+    def _find_stale_nodeids(self, collected_nodeids: "Set[str]") -> "Set[str]":
+        """
+        Returns the test ids of the durations of tests which are gone.
+
+        Only the paths given on the command line are collected, and files selected
+        with "::" only partially. So an uncollected test below those paths is gone if
+        its file was collected or doesn't exist.
+        """
+        # Paths are relative to the current directory, which tests may change later
+        roots = [os.path.abspath(arg) for arg in self.config.args if "::" not in arg]
+        collected_files = {_nodeid_file(nodeid) for nodeid in collected_nodeids}
+
+        stale = set()
+        for nodeid in self.cached_durations.keys() - collected_nodeids:
+            nodeid_file = _nodeid_file(nodeid)
+            path = os.path.abspath(self.config.cwd_relative_nodeid(nodeid_file))
+            if _is_under(path, roots) and (
+                nodeid_file in collected_files or not os.path.exists(path)
+            ):
+                stale.add(nodeid)
+        return stale
+
+    def _store_durations(self, durations_format: "DurationsFormat") -> None:
+        """
+        Rewrites the durations file with all durations, which empties its log.
+        """
+        durations_path = self.config.option.durations_path
+        content = format_durations(self.cached_durations, durations_format)
+        # Write to a sibling file and move it in place, so that an interrupted
+        # run can't leave a truncated durations file behind
+        tmp_path = f"{durations_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, durations_path)
+        except BaseException:
+            # Opening the file may be what failed
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+
+        try:
+            os.remove(durations_log_path(durations_path))
+        except FileNotFoundError:
+            pass
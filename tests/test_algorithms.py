@@ -131,3 +131,20 @@ class TestAlgorithms:
                     if not selected_each[i]:
                         selected_each[i] = set(group.selected)
                     assert selected_each[i] == set(group.selected)
+
+    @pytest.mark.parametrize("algo_name", Algorithms.names())
+    def test__split_tests_without_durations_same_as_with_irrelevant_durations(
+        self, algo_name
+    ):
+        # Without any durations a shortcut is taken, it must split just like
+        # when every test gets the same (average) duration
+        tests = ["e", "a", "d", "c", "b", "g", "f"]
+        items = [item(t) for t in tests]
+        algo = Algorithms[algo_name].value
+        for n in (1, 2, 3, 4, 8):
+            without_durations = algo(splits=n, items=items, durations={})
+            with_durations = algo(splits=n, items=items, durations={"x": 1})
+            for group, expected in zip(without_durations, with_durations):
+                assert group.selected == expected.selected
+                assert set(group.deselected) == set(expected.deselected)
+                assert group.duration == expected.duration
@@ -0,0 +1,124 @@
+import warnings
+
+import pytest
+
+from pytest_split import durations as durations_module
+from pytest_split.durations import (
+    DurationsFormat,
+    append_durations_log,
+    detect_format,
+    format_durations,
+    load_durations_log,
+    parse_durations,
+    read_durations,
+)
+
+
+@pytest.fixture(params=["json", "orjson"])
+def json_parser(request, monkeypatch):
+    """
+    Runs a test with both the stdlib JSON parser and orjson.
+    """
+    module = pytest.importorskip("orjson") if request.param == "orjson" else None
+    monkeypatch.setattr(durations_module, "orjson", module)
+
+
+class TestDurations:
+    @pytest.mark.parametrize("durations_format", DurationsFormat.names())
+    def test_it_round_trips(self, durations_format, json_parser):
+        durations = {"test_a.py::test_1": 0.5, "test_a.py::test_2[a b]": 1.25}
+        content = format_durations(durations, DurationsFormat[durations_format])
+
+        assert detect_format(content) is DurationsFormat[durations_format]
+        assert parse_durations(content, DurationsFormat[durations_format]) == durations
+
+    @pytest.mark.parametrize("durations_format", DurationsFormat.names())
+    def test_it_reads_durations_file(self, tmpdir, durations_format, json_parser):
+        durations_path = str(tmpdir.join(".durations"))
+        durations = {"test_a.py::test_1": 0.5, "test_a.py::test_测试": 1.25}
+        with open(durations_path, "w", encoding="utf-8") as f:
+            f.write(format_durations(durations, DurationsFormat[durations_format]))
+
+        assert read_durations(durations_path) == (
+            durations,
+            DurationsFormat[durations_format],
+        )
+
+    @pytest.mark.parametrize("durations_format", DurationsFormat.names())
+    def test_it_reads_test_names_with_line_separators(
+        self, tmpdir, durations_format, json_parser
+    ):
+        durations_path = str(tmpdir.join(".durations"))
+        durations = {"t.py::test[a\x85b]": 0.5, "t.py::test[a\u2028\rb]": 1.25}
+        with open(durations_path, "w", encoding="utf-8", newline="") as f:
+            f.write(format_durations(durations, DurationsFormat[durations_format]))
+
+        assert read_durations(durations_path)[0] == durations
+
+    def test_it_reads_log_test_names_with_line_separators(self, tmpdir):
+        durations_path = str(tmpdir.join(".durations"))
+        append_durations_log({"t.py::test[a\x0cb]": 1.0}, durations_path)
+
+        assert load_durations_log(durations_path) == {"t.py::test[a\x0cb]": 1.0}
+
+    def test_it_formats_tsv_sorted_by_test_name(self):
+        content = format_durations({"b": 2.0, "a": 1.0}, DurationsFormat.tsv)
+        assert content == "a\t1\nb\t2\n"
+
+    @pytest.mark.parametrize(
+        "content, durations_format",
+        [
+            ("{}", DurationsFormat.json),
+            (b" [", DurationsFormat.json),
+            ("a\t1\n", DurationsFormat.tsv),
+            (b"a\t1\n", DurationsFormat.tsv),
+        ],
+    )
+    def test_it_detects_format_without_mixing_bytes_and_str(
+        self, content, durations_format
+    ):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", BytesWarning)
+            assert detect_format(content) is durations_format
+
+    def test_it_parses_legacy_json_list(self, json_parser):
+        content = '[["a", 1.0], ["b", 2.0]]'
+        assert detect_format(content) is DurationsFormat.json
+        assert parse_durations(content, DurationsFormat.json) == {"a": 1.0, "b": 2.0}
+
+    def test_it_parses_empty_content(self):
+        assert detect_format("") is DurationsFormat.tsv
+        assert parse_durations("", DurationsFormat.tsv) == {}
+
+    def test_it_loads_last_appended_durations_from_log(self, tmpdir):
+        durations_path = str(tmpdir.join(".durations"))
+        assert load_durations_log(durations_path) == {}
+
+        append_durations_log({"a": 1.0, "b": 2.0}, durations_path)
+        append_durations_log({"a": 3.0}, durations_path)
+
+        assert load_durations_log(durations_path) == {"a": 3.0, "b": 2.0}
+
+    def test_it_ignores_incomplete_line_in_log(self, tmpdir):
+        durations_path = str(tmpdir.join(".durations"))
+        with open(f"{durations_path}.log", "w") as f:
+            f.write("a\t1\nb\t")
+
+        assert load_durations_log(durations_path) == {"a": 1.0}
+
+    def test_it_appends_after_incomplete_line_in_log(self, tmpdir):
+        durations_path = str(tmpdir.join(".durations"))
+        with open(f"{durations_path}.log", "w") as f:
+            f.write("a\t1\nb\t0.5")
+
+        append_durations_log({"c": 2.0}, durations_path)
+
+        assert load_durations_log(durations_path) == {"a": 1.0, "c": 2.0}
+
+    def test_it_logs_non_ascii_test_names(self, tmpdir):
+        durations_path = str(tmpdir.join(".durations"))
+        append_durations_log({"test_测试": 1.0}, durations_path)
+
+        with open(f"{durations_path}.log", encoding="utf-8") as f:
+            assert f.read() == "test_测试\t1\n"
+        assert load_durations_log(durations_path) == {"test_测试": 1.0}
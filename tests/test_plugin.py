@@ -93,6 +93,263 @@ class TestStoreDurations:
             assert item not in durations.keys()
         assert len(durations) == EXAMPLE_SUITE_TEST_COUNT
 
+    def test_it_does_not_leave_temporary_file(self, example_suite, durations_path):
+        example_suite.runpytest("--store-durations", "--durations-path", durations_path)
+
+        assert os.path.exists(durations_path)
+        assert not os.path.exists(f"{durations_path}.tmp")
+
+    def test_it_removes_temporary_file_when_storing_fails(
+        self, example_suite, durations_path, monkeypatch
+    ):
+        with open(durations_path, "w") as f:
+            json.dump({"test_old": 1}, f)
+
+        replace = os.replace
+
+        def failing_replace(src, dst):
+            if src == f"{durations_path}.tmp":
+                raise OSError("No space left on device")
+            replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", failing_replace)
+        example_suite.runpytest("--store-durations", "--durations-path", durations_path)
+
+        assert not os.path.exists(f"{durations_path}.tmp")
+        with open(durations_path) as f:
+            assert json.load(f) == {"test_old": 1}
+
+    def test_it_reports_error_when_opening_temporary_file_fails(self, example_suite):
+        durations_path = str(example_suite.tmpdir.join("missing", ".durations"))
+        result = example_suite.runpytest(
+            "--store-durations", "--durations-path", durations_path
+        )
+
+        assert result.ret == ExitCode.INTERNAL_ERROR
+        output = result.stdout.str() + result.stderr.str()
+        assert "FileNotFoundError" in output
+        assert "During handling of the above exception" not in output
+
+    def test_it_does_not_rewrite_unchanged_durations(
+        self, example_suite, durations_path
+    ):
+        # Not in the file's usual format, so a rewrite would be noticed
+        content = '{"test_old1": 1, "test_old2": 2}'
+        with open(durations_path, "w") as f:
+            f.write(content)
+
+        example_suite.runpytest(
+            "--store-durations", "--durations-path", durations_path, "-k", "nothing"
+        )
+
+        with open(durations_path) as f:
+            assert f.read() == content
+
+    def test_it_stores_in_tsv_format(self, example_suite, durations_path):
+        example_suite.runpytest(
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--durations-format",
+            "tsv",
+        )
+
+        with open(durations_path) as f:
+            lines = f.read().splitlines()
+
+        assert len(lines) == EXAMPLE_SUITE_TEST_COUNT
+        for line in lines:
+            test_name, duration = line.split("\t")
+            assert test_name.startswith("test_it_stores_in_tsv_format.py::test_")
+            float(duration)
+
+    def test_it_stores_non_ascii_test_names_in_tsv_format(
+        self, testdir, durations_path
+    ):
+        testdir.makepyfile("def test_测试(): pass\n")
+
+        testdir.runpytest(
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--durations-format",
+            "tsv",
+        )
+
+        with open(durations_path, encoding="utf-8") as f:
+            (line,) = f.read().splitlines()
+        assert line.split("\t")[0].endswith("::test_测试")
+
+        result = testdir.inline_run(
+            "--splits", "1", "--group", "1", "--durations-path", durations_path
+        )
+        result.assertoutcome(passed=1)
+
+    def test_it_converts_unchanged_durations_to_new_format(
+        self, example_suite, durations_path
+    ):
+        old_durations = {"test_old1": 1, "test_old2": 2}
+        with open(durations_path, "w") as f:
+            json.dump(old_durations, f)
+
+        example_suite.runpytest(
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--durations-format",
+            "tsv",
+            "-k",
+            "nothing",
+        )
+
+        with open(durations_path) as f:
+            assert f.read() == "test_old1\t1\ntest_old2\t2\n"
+
+    def test_it_appends_durations_to_log(self, example_suite, durations_path):
+        # Large enough for the log not to be merged into it right away
+        old_durations = {f"test_old{num}": 1 for num in range(1000)}
+        with open(durations_path, "w") as f:
+            json.dump(old_durations, f)
+
+        example_suite.runpytest(
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--durations-append",
+        )
+
+        with open(durations_path) as f:
+            assert json.load(f) == old_durations
+        with open(f"{durations_path}.log") as f:
+            assert len(f.read().splitlines()) == EXAMPLE_SUITE_TEST_COUNT
+
+    def test_it_merges_large_log_into_durations(self, example_suite, durations_path):
+        old_durations = {"test_old1": 1, "test_old2": 2}
+        with open(durations_path, "w") as f:
+            json.dump(old_durations, f)
+
+        example_suite.runpytest(
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--durations-append",
+        )
+
+        with open(durations_path) as f:
+            durations = json.load(f)
+        assert len(durations) == EXAMPLE_SUITE_TEST_COUNT + len(old_durations)
+        assert not os.path.exists(f"{durations_path}.log")
+
+    def test_it_merges_log_when_rewriting(self, example_suite, durations_path):
+        with open(durations_path, "w") as f:
+            json.dump({"test_old1": 1}, f)
+        with open(f"{durations_path}.log", "w") as f:
+            f.write("test_old1\t2\n")
+
+        example_suite.runpytest("--store-durations", "--durations-path", durations_path)
+
+        with open(durations_path) as f:
+            assert json.load(f)["test_old1"] == 2
+        assert not os.path.exists(f"{durations_path}.log")
+
+    def test_it_prunes_durations_of_tests_not_collected(
+        self, example_suite, durations_path
+    ):
+        test_dir = "test_it_prunes_durations_of_tests_not_collected0"
+        test_name = (
+            f"{test_dir}/test_it_prunes_durations_of_tests_not_collected.py::test_1"
+        )
+        removed_test_name = f"{test_dir}/test_removed.py::test_old1"
+        old_durations = {removed_test_name: 1, test_name: 2}
+        with open(durations_path, "w") as f:
+            json.dump(old_durations, f)
+
+        example_suite.runpytest(
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--prune-durations",
+            "-k",
+            "test_2",
+        )
+
+        with open(durations_path) as f:
+            durations = json.load(f)
+
+        assert removed_test_name not in durations
+        # Deselected, but still collected
+        assert durations[test_name] == 2
+
+    def test_it_prunes_only_durations_under_given_paths(self, testdir, durations_path):
+        testdir.makeini("[pytest]\n")
+        testdir.makepyfile(test_a="def test_a(): pass\n", test_b="def test_b(): pass\n")
+        old_durations = {
+            "test_a.py::test_old": 1,
+            "test_b.py::test_b": 2,
+            "test_gone.py::test_gone": 3,
+        }
+        with open(durations_path, "w") as f:
+            json.dump(old_durations, f)
+
+        testdir.runpytest(
+            "test_a.py",
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--prune-durations",
+        )
+
+        with open(durations_path) as f:
+            durations = json.load(f)
+
+        assert set(durations) == {
+            "test_a.py::test_a",
+            "test_b.py::test_b",
+            "test_gone.py::test_gone",
+        }
+
+    def test_it_does_not_prune_files_selected_partially(self, testdir, durations_path):
+        testdir.makeini("[pytest]\n")
+        testdir.makepyfile(test_a="def test_1(): pass\ndef test_2(): pass\n")
+        with open(durations_path, "w") as f:
+            json.dump({"test_a.py::test_2": 2}, f)
+
+        testdir.runpytest(
+            "test_a.py::test_1",
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--prune-durations",
+        )
+
+        with open(durations_path) as f:
+            durations = json.load(f)
+
+        assert durations["test_a.py::test_2"] == 2
+
+    def test_it_does_not_prune_with_last_failed(self, testdir):
+        testdir.makeini("[pytest]\n")
+        # Next to the tests, so that it doesn't change pytest's rootdir and cache
+        durations_path = str(testdir.tmpdir.join(".durations"))
+        testdir.makepyfile(
+            test_a="def test_fail(): assert False\ndef test_pass(): pass\n"
+        )
+        testdir.runpytest("--store-durations", "--durations-path", durations_path)
+
+        result = testdir.runpytest(
+            "--lf",
+            "--store-durations",
+            "--durations-path",
+            durations_path,
+            "--prune-durations",
+        )
+        result.assert_outcomes(failed=1)
+
+        with open(durations_path) as f:
+            durations = json.load(f)
+
+        assert set(durations) == {"test_a.py::test_fail", "test_a.py::test_pass"}
+
     def test_it_does_not_store_without_flag(self, example_suite, durations_path):
         example_suite.runpytest("--durations-path", durations_path)
         assert not os.path.exists(durations_path)
@@ -251,6 +508,19 @@ class TestSplitToSuites:
         result.assertoutcome(passed=3)
         assert _passed_test_names(result) == ["test_8", "test_9", "test_10"]
 
+    def test_it_splits_with_tsv_durations(self, example_suite, durations_path):
+        test_path = "test_it_splits_with_tsv_durations0/test_it_splits_with_tsv_durations.py::{}"
+        with open(durations_path, "w") as f:
+            f.write(f"{test_path.format('test_1')}\t100\n")
+            for num in range(2, 11):
+                f.write(f"{test_path.format(f'test_{num}')}\t1\n")
+
+        result = example_suite.inline_run(
+            "--splits", "2", "--group", "1", "--durations-path", durations_path
+        )
+        result.assertoutcome(passed=1)
+        assert _passed_test_names(result) == ["test_1"]
+
     def test_handles_case_of_no_durations_for_group(
         self, example_suite, durations_path
     ):